@@ -0,0 +1,233 @@
+"""
+Epoch time / peak RSS benchmark: notebook-style generators vs. the feature store.
+
+The "legacy" mode reproduces what the training cells do today: np.load the
+full float32 feature arrays into RAM and copy shuffled batches out of them with
+.astype('float32'). The "store" mode serves the same batches from
+polyglot_feature_store.CachedMultimodalSequence. Each mode runs in its own
+process so peak RSS is measured independently.
+
+With --videos the benchmark also times feature computation on the real
+dataset: a cold build into an empty store (what every notebook run pays today)
+against a warm rerun on the populated store (what a run pays with the cache).
+
+    python benchmark_feature_store.py --samples 140 --batch-size 4 --epochs 3
+    python benchmark_feature_store.py --videos /content/drive/MyDrive/PolyGlotFake3 --limit 20
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from polyglot_feature_store import (
+    AUDIO_FEAT_DIM, FRAME_SIZE, LIP_MODEL_NAME, MAX_TIME_STEPS, SEQ_LENGTH,
+    WHISPER_MODEL_ID, CachedMultimodalSequence, FeatureStore, build_audio_features,
+    build_lip_features, collect_videos, release_models,
+)
+
+AUDIO_MODEL_NAME = f"audio_wav2vec2+{WHISPER_MODEL_ID}"
+VIDEO_SHAPE = (SEQ_LENGTH, FRAME_SIZE, FRAME_SIZE, 3)
+AUDIO_SHAPE = (MAX_TIME_STEPS, AUDIO_FEAT_DIM)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB.
+
+    VmHWM is preferred because ru_maxrss survives exec on Linux and would
+    report the parent's peak for the benchmark subprocesses.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_synthetic_data(work_dir, samples, seed=0):
+    """Write the same random features as legacy .npy files and as a feature store"""
+    rng = np.random.default_rng(seed)
+    keys = [f"{i:040x}" for i in range(samples)]
+    labels = rng.integers(0, 2, samples)
+    np.save(os.path.join(work_dir, 'labels.npy'), labels)
+
+    legacy_video = np.lib.format.open_memmap(
+        os.path.join(work_dir, 'legacy_video.npy'), mode='w+', dtype=np.float32,
+        shape=(samples,) + VIDEO_SHAPE)
+    legacy_audio = np.lib.format.open_memmap(
+        os.path.join(work_dir, 'legacy_audio.npy'), mode='w+', dtype=np.float32,
+        shape=(samples,) + AUDIO_SHAPE)
+
+    def compute(shape, target):
+        def compute_batch(batch_keys):
+            rows = [int(key, 16) for key in batch_keys]
+            features = rng.random((len(rows),) + shape, dtype=np.float32)
+            target[rows] = features
+            return features
+        return compute_batch
+
+    store = FeatureStore(os.path.join(work_dir, 'store'))
+    store.write(LIP_MODEL_NAME, keys, compute(VIDEO_SHAPE, legacy_video), VIDEO_SHAPE)
+    store.write(AUDIO_MODEL_NAME, keys, compute(AUDIO_SHAPE, legacy_audio), AUDIO_SHAPE)
+    legacy_video.flush()
+    legacy_audio.flush()
+    return keys
+
+
+class LegacyGenerator:
+    """Same batching as MultimodalDataGenerator in the notebook"""
+
+    def __init__(self, video_data, audio_data, labels, batch_size):
+        self.video_data = video_data
+        self.audio_data = audio_data
+        self.labels = labels
+        self.batch_size = batch_size
+        self.indices = np.arange(len(self.labels))
+
+    def __len__(self):
+        return int(np.ceil(len(self.labels) / self.batch_size))
+
+    def __getitem__(self, idx):
+        batch_indices = self.indices[idx*self.batch_size:(idx+1)*self.batch_size]
+        batch_video = self.video_data[batch_indices].astype('float32')
+        batch_audio = self.audio_data[batch_indices].astype('float32')
+        batch_labels = self.labels[batch_indices].astype('float32')
+        return {"input_1": batch_video, "input_2": batch_audio}, batch_labels
+
+    def on_epoch_end(self):
+        np.random.shuffle(self.indices)
+
+
+def build_all(store, videos):
+    build_lip_features(store, videos)
+    build_audio_features(store, videos)
+
+
+def measure_feature_cache(dataset_dir, store_dir, limit=None, build=build_all):
+    """
+    Times building the features into an empty store (cold) and rebuilding them
+    on the populated store (warm). Hashing the videos is part of both runs.
+    """
+    start = time.perf_counter()
+    videos = collect_videos(dataset_dir)[:limit]
+    hash_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    build(FeatureStore(store_dir), videos)
+    cold_seconds = hash_seconds + time.perf_counter() - start
+    release_models()
+
+    start = time.perf_counter()
+    build(FeatureStore(store_dir), videos)
+    warm_seconds = hash_seconds + time.perf_counter() - start
+
+    return {
+        'videos': len(videos),
+        'hash_seconds': round(hash_seconds, 4),
+        'cold_seconds': round(cold_seconds, 4),
+        'warm_seconds': round(warm_seconds, 4),
+        'speedup': round(cold_seconds / warm_seconds, 2),
+    }
+
+
+def run_mode(mode, work_dir, batch_size, epochs):
+    """Iterate every batch for `epochs` epochs and report timings"""
+    labels = np.load(os.path.join(work_dir, 'labels.npy'))
+    start = time.perf_counter()
+    if mode == 'legacy':
+        generator = LegacyGenerator(
+            np.load(os.path.join(work_dir, 'legacy_video.npy')),
+            np.load(os.path.join(work_dir, 'legacy_audio.npy')),
+            labels, batch_size)
+    else:
+        keys = [f"{i:040x}" for i in range(len(labels))]
+        generator = CachedMultimodalSequence(
+            FeatureStore(os.path.join(work_dir, 'store')), keys, labels, batch_size)
+    load_seconds = time.perf_counter() - start
+
+    epoch_seconds = []
+    checksum = 0.0
+    for _ in range(epochs):
+        start = time.perf_counter()
+        for idx in range(len(generator)):
+            inputs, _ = generator[idx]
+            checksum += float(inputs['input_2'][:, 0, 0].sum())
+        generator.on_epoch_end()
+        epoch_seconds.append(time.perf_counter() - start)
+
+    return {
+        'mode': mode,
+        'load_seconds': round(load_seconds, 4),
+        'epoch_seconds': [round(s, 4) for s in epoch_seconds],
+        'mean_epoch_seconds': round(float(np.mean(epoch_seconds)), 4),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'checksum': checksum,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--samples', type=int, default=140)
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--epochs', type=int, default=3)
+    parser.add_argument('--work-dir', default=None, help='Reuse an existing benchmark directory')
+    parser.add_argument('--videos', help='PolyGlot dataset root; also time cold vs. warm feature computation')
+    parser.add_argument('--limit', type=int, default=None, help='Only use the first N videos with --videos')
+    parser.add_argument('--mode', choices=['legacy', 'store'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.work_dir, args.batch_size, args.epochs)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = args.work_dir or tmp
+        if not os.path.exists(os.path.join(work_dir, 'labels.npy')):
+            print(f"Writing {args.samples} synthetic samples to {work_dir}", file=sys.stderr)
+            with contextlib.redirect_stdout(sys.stderr):
+                make_synthetic_data(work_dir, args.samples)
+
+        results = {}
+        for mode in ('legacy', 'store'):
+            output = subprocess.run(
+                [sys.executable, __file__, '--mode', mode, '--work-dir', work_dir,
+                 '--batch-size', str(args.batch_size), '--epochs', str(args.epochs)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+
+        if args.videos:
+            with contextlib.redirect_stdout(sys.stderr):
+                results['feature_cache'] = measure_feature_cache(
+                    args.videos, os.path.join(work_dir, 'video_store'), args.limit)
+
+    legacy, store = results['legacy'], results['store']
+    results['samples'] = args.samples
+    results['batch_size'] = args.batch_size
+    # Serving only: how fast batches come out of RAM vs. the memmap, with the
+    # features already computed. It is not the end-to-end epoch time.
+    results['batch_serving_speedup'] = round(legacy['mean_epoch_seconds'] / store['mean_epoch_seconds'], 2)
+    results['peak_rss_reduction_mb'] = round(legacy['peak_rss_mb'] - store['peak_rss_mb'], 1)
+    if args.videos:
+        # A notebook run recomputes every feature before its epochs; a cached
+        # run only rehashes the videos and finds them in the store.
+        cache = results['feature_cache']
+        recompute = cache['cold_seconds'] + args.epochs * legacy['mean_epoch_seconds']
+        cached = cache['warm_seconds'] + args.epochs * store['mean_epoch_seconds']
+        results['run_seconds_recompute'] = round(recompute, 4)
+        results['run_seconds_cached'] = round(cached, 4)
+        results['run_speedup'] = round(recompute / cached, 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
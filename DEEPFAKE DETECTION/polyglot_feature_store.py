@@ -0,0 +1,515 @@
+"""
+Cached audio/visual feature store for the PolyGlot multimodal deepfake models.
+
+The notebook recomputes Wav2Vec2/Whisper embeddings and MediaPipe lip crops on
+every run and then feeds them to Keras through generators that copy whole
+batches out of in-RAM arrays. This module computes each feature once, stores it
+as a float16 memory-mapped .npy file per model, keys every row by the SHA-1 of
+the source video, and serves training batches straight from the memmap.
+
+Layout on disk:
+
+    <store_root>/index.json                  {model_name: {"shape": [...], "rows": {video_hash: row}}}
+    <store_root>/<model_name>.npy             float16 array, one row per video
+
+Usage from the notebook:
+
+    store = FeatureStore('/content/drive/MyDrive/PolyGlotFake3/feature_store')
+    videos = collect_videos('/content/drive/MyDrive/PolyGlotFake3')
+    build_audio_features(store, videos)
+    build_lip_features(store, videos)
+    train_gen = CachedMultimodalSequence(store, [v['hash'] for v in train], y_train, BATCH_SIZE)
+    test_gen = CachedMultimodalSequence(store, [v['hash'] for v in test], y_test, BATCH_SIZE, shuffle=False)
+"""
+import gc
+import hashlib
+import json
+import os
+
+import numpy as np
+
+try:
+    from tensorflow.keras.utils import Sequence
+except ImportError:  # building the store does not need TensorFlow
+    Sequence = object
+
+# Configuration (kept in sync with the notebook)
+SAMPLE_RATE = 16000
+MAX_AUDIO_LENGTH = 30  # seconds
+MAX_TIME_STEPS = 1500
+AUDIO_FEAT_DIM = 1792  # 1024 (Wav2Vec2) + 768 (Whisper)
+SEQ_LENGTH = 40
+FRAME_SIZE = 64
+STORE_DTYPE = np.float16
+
+LANG_TO_WAV2VEC2 = {
+    'en': 'facebook/wav2vec2-large-robust-ft-swbd-300h',
+    'fr': 'facebook/wav2vec2-large-xlsr-53-french',
+    'ru': 'anton-l/wav2vec2-large-xlsr-53-russian',
+    'es': 'facebook/wav2vec2-large-xlsr-53-spanish',
+    'zh': 'jonatasgrosman/wav2vec2-large-xlsr-53-chinese-zh-cn',
+    'ja': 'jonatasgrosman/wav2vec2-large-xlsr-53-japanese',
+    'ar': 'jonatasgrosman/wav2vec2-large-xlsr-53-arabic'
+}
+WHISPER_MODEL_ID = "openai/whisper-small"
+LIP_MODEL_NAME = "mediapipe_lips"
+
+# MediaPipe lips indices (upper and lower lips)
+LIPS_INDICES = [
+    61, 185, 40, 39, 37, 0, 267, 269, 270, 409, 291,
+    375, 321, 405, 314, 17, 84, 181, 91, 146,
+    78, 191, 80, 81, 82, 13, 312, 311, 310, 415, 308,
+    324, 318, 402, 317, 14, 87, 178, 88, 95
+]
+
+# One loaded model per language / per process
+_WAV2VEC2_CACHE = {}
+_WHISPER_CACHE = {}
+
+
+# =======================
+# --- Model Cache ---
+# =======================
+def get_wav2vec2(lang):
+    """Return the cached (processor, model) pair for a language, loading it on first use"""
+    if lang not in _WAV2VEC2_CACHE:
+        from transformers import Wav2Vec2Processor, Wav2Vec2Model
+
+        model_id = LANG_TO_WAV2VEC2[lang]
+        print(f"Loading Wav2Vec2 for language: {lang} ({model_id})")
+        processor = Wav2Vec2Processor.from_pretrained(model_id)
+        model = Wav2Vec2Model.from_pretrained(model_id).eval()
+        _WAV2VEC2_CACHE[lang] = (processor, model)
+    return _WAV2VEC2_CACHE[lang]
+
+
+def get_whisper():
+    """Return the cached (feature extractor, encoder) pair for Whisper"""
+    if WHISPER_MODEL_ID not in _WHISPER_CACHE:
+        from transformers import WhisperFeatureExtractor, WhisperModel
+
+        print(f"Loading Whisper encoder ({WHISPER_MODEL_ID})")
+        feature_extractor = WhisperFeatureExtractor.from_pretrained(WHISPER_MODEL_ID)
+        encoder = WhisperModel.from_pretrained(WHISPER_MODEL_ID).encoder.eval()
+        _WHISPER_CACHE[WHISPER_MODEL_ID] = (feature_extractor, encoder)
+    return _WHISPER_CACHE[WHISPER_MODEL_ID]
+
+
+def release_models():
+    """Drop every cached model so the memory can be reclaimed"""
+    _WAV2VEC2_CACHE.clear()
+    _WHISPER_CACHE.clear()
+    gc.collect()
+
+
+# =======================
+# --- Feature Store ---
+# =======================
+def video_hash(path, block_size=1 << 20):
+    """SHA-1 of the video file contents, used as the cache key"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _safe_name(model_name):
+    return model_name.replace('/', '__')
+
+
+class FeatureStore:
+    """Float16 memory-mapped features keyed by video hash and model name"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.index_path = os.path.join(root, 'index.json')
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+        self._memmaps = {}
+
+    def path(self, model_name):
+        return os.path.join(self.root, f"{_safe_name(model_name)}.npy")
+
+    def has(self, model_name, key):
+        return key in self.index.get(model_name, {}).get('rows', {})
+
+    def missing(self, model_name, keys):
+        """Keys (in order, without duplicates) that are not cached for this model yet"""
+        seen = set()
+        result = []
+        for key in keys:
+            if key not in seen and not self.has(model_name, key):
+                seen.add(key)
+                result.append(key)
+        return result
+
+    def rows(self, model_name, keys):
+        """Row numbers of the given keys inside the model's memmap"""
+        lookup = self.index[model_name]['rows']
+        try:
+            return np.array([lookup[key] for key in keys], dtype=np.int64)
+        except KeyError as e:
+            raise KeyError(f"No '{model_name}' features cached for video {e.args[0]}") from None
+
+    def open(self, model_name):
+        """Read-only memmap of all rows stored for a model"""
+        if model_name not in self._memmaps:
+            self._memmaps[model_name] = np.load(self.path(model_name), mmap_mode='r')
+        return self._memmaps[model_name]
+
+    def write(self, model_name, keys, compute_batch, feature_shape, batch_size=8):
+        """Compute features for the keys that are not cached yet and append them.
+
+        Args:
+            model_name (str): Name of the feature extractor (file and index key).
+            keys (list[str]): Video hashes to make available.
+            compute_batch (callable): Takes a list of keys, returns an array of
+                shape (len(keys), *feature_shape) or None for a failed key.
+            feature_shape (tuple): Shape of a single row.
+            batch_size (int): Number of videos per inference batch.
+
+        Returns:
+            list[str]: Keys that could not be computed.
+        """
+        todo = self.missing(model_name, keys)
+        if not todo:
+            print(f"[{model_name}] all {len(keys)} videos already cached")
+            return []
+
+        entry = self.index.get(model_name, {'shape': list(feature_shape), 'rows': {}})
+        if tuple(entry['shape']) != tuple(feature_shape):
+            raise ValueError(
+                f"Cached '{model_name}' features have shape {tuple(entry['shape'])}, "
+                f"got {tuple(feature_shape)}"
+            )
+        old_count = len(entry['rows'])
+
+        # Write into a new file and swap it in, so an interrupted run never
+        # leaves a half-written store behind.
+        final_path = self.path(model_name)
+        tmp_path = final_path + '.tmp'
+        out = np.lib.format.open_memmap(
+            tmp_path, mode='w+', dtype=STORE_DTYPE,
+            shape=(old_count + len(todo),) + tuple(feature_shape)
+        )
+        if old_count:
+            old = self.open(model_name)
+            for start in range(0, old_count, batch_size):
+                out[start:start + batch_size] = old[start:start + batch_size]
+
+        rows = dict(entry['rows'])
+        failed = []
+        next_row = old_count
+        for start in range(0, len(todo), batch_size):
+            batch_keys = todo[start:start + batch_size]
+            features = compute_batch(batch_keys)
+            for key, feature in zip(batch_keys, features):
+                if feature is None:
+                    failed.append(key)
+                    continue
+                out[next_row] = feature
+                rows[key] = next_row
+                next_row += 1
+            print(f"[{model_name}] cached {next_row - old_count}/{len(todo)} new videos")
+
+        out.flush()
+        del out
+        if next_row < old_count + len(todo):
+            self._truncate(tmp_path, next_row, feature_shape)
+
+        self._memmaps.pop(model_name, None)
+        os.replace(tmp_path, final_path)
+        entry['rows'] = rows
+        self.index[model_name] = entry
+        self._save_index()
+        return failed
+
+    def _truncate(self, path, count, feature_shape):
+        """Rewrite a store file keeping only its first `count` rows"""
+        full = np.load(path, mmap_mode='r')
+        trimmed = np.lib.format.open_memmap(
+            path + '.trim', mode='w+', dtype=STORE_DTYPE,
+            shape=(count,) + tuple(feature_shape)
+        )
+        trimmed[:] = full[:count]
+        trimmed.flush()
+        del trimmed, full
+        os.replace(path + '.trim', path)
+
+    def _save_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+
+# =======================
+# --- Dataset Discovery ---
+# =======================
+def collect_videos(root_dir, splits=(('real', 'real3', 0), ('fake', 'fake3', 1))):
+    """List every .mp4 under the real/fake language folders with its hash, language and label"""
+    videos = []
+    for label_name, folder, label in splits:
+        label_path = os.path.join(root_dir, folder)
+        if not os.path.isdir(label_path):
+            print(f"⚠️ Missing directory: {label_path}")
+            continue
+        for lang_folder in sorted(os.listdir(label_path)):
+            lang_path = os.path.join(label_path, lang_folder)
+            if not os.path.isdir(lang_path):
+                continue
+            lang = lang_folder.replace('to_', '')
+            for file in sorted(os.listdir(lang_path)):
+                if file.lower().endswith('.mp4'):
+                    path = os.path.join(lang_path, file)
+                    videos.append({
+                        'path': path,
+                        'hash': video_hash(path),
+                        'lang': lang,
+                        'label': label,
+                    })
+    print(f"🔍 Found {len(videos)} videos")
+    return videos
+
+
+# =======================
+# --- Audio Features ---
+# =======================
+def load_waveform(video_path):
+    """Decode the audio track to mono 16 kHz and pad/trim to MAX_AUDIO_LENGTH seconds"""
+    import librosa
+
+    audio, _ = librosa.load(video_path, sr=SAMPLE_RATE, mono=True)
+    target_samples = SAMPLE_RATE * MAX_AUDIO_LENGTH
+    if len(audio) < target_samples:
+        audio = np.pad(audio, (0, target_samples - len(audio)))
+    return audio[:target_samples].astype(np.float32)
+
+
+def _fit_time_steps(features):
+    """Pad or truncate (batch, time, dim) features to MAX_TIME_STEPS"""
+    if features.shape[1] < MAX_TIME_STEPS:
+        pad = MAX_TIME_STEPS - features.shape[1]
+        features = np.pad(features, ((0, 0), (0, pad), (0, 0)))
+    return features[:, :MAX_TIME_STEPS]
+
+
+def extract_audio_batch(waveforms, lang):
+    """Wav2Vec2 + Whisper features for a batch of same-language waveforms.
+
+    Returns:
+        np.ndarray: (batch, MAX_TIME_STEPS, AUDIO_FEAT_DIM) float16 features.
+    """
+    import torch
+
+    processor, wav2vec2 = get_wav2vec2(lang)
+    whisper_fe, whisper = get_whisper()
+
+    with torch.inference_mode():
+        wav_input = processor(waveforms, return_tensors="pt", sampling_rate=SAMPLE_RATE, padding=True)
+        wav_features = wav2vec2(wav_input.input_values).last_hidden_state.numpy()
+
+        whisper_input = whisper_fe(waveforms, sampling_rate=SAMPLE_RATE, return_tensors="pt").input_features
+        whisper_features = whisper(whisper_input).last_hidden_state.numpy()
+
+    # Align time steps, combine and fix the length
+    min_time_steps = min(wav_features.shape[1], whisper_features.shape[1])
+    combined = np.concatenate(
+        [wav_features[:, :min_time_steps], whisper_features[:, :min_time_steps]], axis=2
+    )
+    return _fit_time_steps(combined).astype(STORE_DTYPE)
+
+
+def build_audio_features(store, videos, batch_size=8, num_threads=None):
+    """Cache the combined audio features of every video in a single store write.
+
+    Videos are sorted by language and every batch is split by language, so each
+    sub-batch runs through a single cached Wav2Vec2 model; inference is CPU only.
+    """
+    import torch
+
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+    model_name = f"audio_wav2vec2+{WHISPER_MODEL_ID}"
+    by_key = {v['hash']: v for v in videos}
+    keys = sorted(by_key, key=lambda key: by_key[key]['lang'])
+
+    def compute_batch(batch_keys):
+        features = {}
+        for lang in sorted({by_key[key]['lang'] for key in batch_keys}):
+            waveforms, ok = [], []
+            for key in batch_keys:
+                if by_key[key]['lang'] != lang:
+                    continue
+                try:
+                    waveforms.append(load_waveform(by_key[key]['path']))
+                    ok.append(key)
+                except Exception as e:
+                    print(f"Audio decoding failed for {by_key[key]['path']}: {str(e)}")
+            if waveforms:
+                features.update(zip(ok, extract_audio_batch(waveforms, lang)))
+        return [features.get(key) for key in batch_keys]
+
+    print(f"Processing audio: {len(keys)} videos")
+    failed = store.write(model_name, keys, compute_batch,
+                         (MAX_TIME_STEPS, AUDIO_FEAT_DIM), batch_size)
+    return model_name, failed
+
+
+# =======================
+# --- Lip Features ---
+# =======================
+_FACE_MESH = None
+
+
+def get_face_mesh():
+    """Return the process-wide MediaPipe Face Mesh instance"""
+    global _FACE_MESH
+    if _FACE_MESH is None:
+        import mediapipe as mp
+
+        _FACE_MESH = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=False,
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.3,
+            min_tracking_confidence=0.3
+        )
+    return _FACE_MESH
+
+
+def extract_lip_frames(video_path, target_frames=SEQ_LENGTH):
+    """Lip crops (target_frames, FRAME_SIZE, FRAME_SIZE, 3) in [0, 1], zero padded"""
+    import cv2
+
+    face_mesh = get_face_mesh()
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return None
+
+    frames = np.zeros((target_frames, FRAME_SIZE, FRAME_SIZE, 3), dtype=STORE_DTYPE)
+    count = 0
+    frame_interval = max(1, int(cap.get(cv2.CAP_PROP_FPS) // 5))
+    frame_idx = 0
+
+    # Read sequentially and skip frames instead of seeking, which is far cheaper
+    while count < target_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if frame_idx % frame_interval == 0:
+            h_img, w_img = frame.shape[:2]
+            results = face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if results.multi_face_landmarks:
+                landmarks = results.multi_face_landmarks[0].landmark
+                xs = np.array([landmarks[i].x * w_img for i in LIPS_INDICES], dtype=np.int32)
+                ys = np.array([landmarks[i].y * h_img for i in LIPS_INDICES], dtype=np.int32)
+                x_min, x_max = max(0, xs.min()), min(w_img, xs.max())
+                y_min, y_max = max(0, ys.min()), min(h_img, ys.max())
+                margin = int(0.2 * max(x_max - x_min, y_max - y_min))
+                lip_region = frame[
+                    max(y_min - margin, 0):min(y_max + margin, h_img),
+                    max(x_min - margin, 0):min(x_max + margin, w_img)
+                ]
+                if lip_region.size > 0:
+                    frames[count] = cv2.resize(lip_region, (FRAME_SIZE, FRAME_SIZE)) / 255.0
+                    count += 1
+        frame_idx += 1
+
+    cap.release()
+    return frames
+
+
+def build_lip_features(store, videos, batch_size=16):
+    """Cache the MediaPipe lip crops of every video"""
+    by_key = {v['hash']: v for v in videos}
+
+    def compute_batch(batch_keys):
+        results = []
+        for key in batch_keys:
+            try:
+                results.append(extract_lip_frames(by_key[key]['path']))
+            except Exception as e:
+                print(f"Lip extraction failed for {by_key[key]['path']}: {str(e)}")
+                results.append(None)
+        return results
+
+    failed = store.write(LIP_MODEL_NAME, list(by_key), compute_batch,
+                         (SEQ_LENGTH, FRAME_SIZE, FRAME_SIZE, 3), batch_size)
+    return LIP_MODEL_NAME, failed
+
+
+# =======================
+# --- Training Batches ---
+# =======================
+class CachedMultimodalSequence(Sequence):
+    """Keras Sequence serving (video, audio) batches by slicing the store memmaps.
+
+    Rows start in key order and, with shuffle=True, are reshuffled after every
+    epoch (as MultimodalDataGenerator does), so predict() on a fresh sequence
+    returns rows aligned with `labels`. The rows of a batch are gathered from the memmap in
+    sorted order so the reads stay sequential, and a batch of consecutive rows
+    (shuffle=False on a split cached in order) is a plain slice. Only the
+    current batch is ever materialised in memory.
+    """
+
+    def __init__(self, store, keys, labels, batch_size,
+                 video_model=LIP_MODEL_NAME, audio_model=f"audio_wav2vec2+{WHISPER_MODEL_ID}",
+                 shuffle=True, input_names=('input_1', 'input_2')):
+        super().__init__()
+        self.video_data = store.open(video_model)
+        self.audio_data = store.open(audio_model)
+        self.video_rows = store.rows(video_model, keys)
+        self.audio_rows = store.rows(audio_model, keys)
+        self.labels = np.asarray(labels, dtype=np.float32)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.input_names = input_names
+        self.indices = np.arange(len(self.labels))
+
+    def __len__(self):
+        return int(np.ceil(len(self.labels) / self.batch_size))
+
+    @staticmethod
+    def _read(data, rows):
+        if len(rows) > 1 and np.all(np.diff(rows) == 1):
+            return data[rows[0]:rows[-1] + 1]
+        order = np.argsort(rows)
+        batch = data[rows[order]]
+        return batch[np.argsort(order)]
+
+    def __getitem__(self, idx):
+        batch_indices = self.indices[idx*self.batch_size:(idx+1)*self.batch_size]
+
+        batch_video = self._read(self.video_data, self.video_rows[batch_indices]).astype('float32')
+        batch_audio = self._read(self.audio_data, self.audio_rows[batch_indices]).astype('float32')
+        batch_labels = self.labels[batch_indices]
+        return {self.input_names[0]: batch_video, self.input_names[1]: batch_audio}, batch_labels
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.indices)
+
+
+if __name__ == "__main__":
+    DATASET_PATH = "/content/drive/MyDrive/PolyGlotFake3"
+    STORE_PATH = os.path.join(DATASET_PATH, "feature_store")
+
+    store = FeatureStore(STORE_PATH)
+    videos = collect_videos(DATASET_PATH)
+
+    # Lip crops first so the audio models are the only large objects in memory
+    _, lip_failed = build_lip_features(store, videos)
+    _, audio_failed = build_audio_features(store, videos)
+    release_models()
+
+    print("\n📊 Feature store report:")
+    print(f"✅ Videos: {len(videos)}")
+    print(f"⚠️ Lip extraction failed: {len(lip_failed)}")
+    print(f"⚠️ Audio extraction failed: {len(audio_failed)}")
@@ -0,0 +1,4 @@
+from .features import FEATURE_COLUMNS, extract_features, normalize_url
+from .model import PhishingScorer
+
+__all__ = ['FEATURE_COLUMNS', 'PhishingScorer', 'extract_features', 'normalize_url']
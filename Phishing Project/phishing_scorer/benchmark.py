@@ -0,0 +1,83 @@
+"""
+Scoring throughput benchmark in URLs/sec on synthetic URLs.
+
+    python -m phishing_scorer.benchmark --model phishing_model.joblib --urls 1000000
+
+Without --model a scorer is fitted on random features, which is enough to time
+feature extraction and the fused matrix-vector product.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+from .features import FEATURE_COLUMNS, extract_features
+from .model import DEFAULT_CHUNK_SIZE, PhishingScorer
+
+_HOSTS = ['example.com', 'secure-login.example.net', 'paypal.com.verify-account.info',
+          'bank_of-america.support', 'cdn.shop.example.org']
+_PATHS = ['', '/', '/index.html', '/login.php', '/account/verify', '/~user/files/download.exe']
+_QUERIES = ['', '?id=1', '?user=a@b.com&token=abc$123', '?q=hello+world&page=2#top', '?r=%2F%2Fevil.com']
+
+
+def synthetic_urls(count, seed=0):
+    rng = np.random.default_rng(seed)
+    schemes = np.array(['http://', 'https://'])[rng.integers(0, 2, count)]
+    hosts = np.array(_HOSTS)[rng.integers(0, len(_HOSTS), count)]
+    paths = np.array(_PATHS)[rng.integers(0, len(_PATHS), count)]
+    queries = np.array(_QUERIES)[rng.integers(0, len(_QUERIES), count)]
+    return [f"{s}{h}{p}{q}" for s, h, p, q in zip(schemes, hosts, paths, queries)]
+
+
+def random_scorer(seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.poisson(3, size=(2000, len(FEATURE_COLUMNS))).astype(float)
+    y = rng.integers(0, 2, 2000)
+    scaler = StandardScaler().fit(X)
+    return PhishingScorer(scaler, LogisticRegression().fit(scaler.transform(X), y))
+
+
+def timed(fn, count):
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    return {'seconds': round(seconds, 4), 'urls_per_sec': round(count / seconds)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark phishing URL scoring throughput")
+    parser.add_argument('--model', help='Saved scorer (defaults to a randomly fitted one)')
+    parser.add_argument('--urls', type=int, default=1_000_000)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    scorer = PhishingScorer.load(args.model) if args.model else random_scorer()
+    urls = synthetic_urls(args.urls)
+    features = extract_features(urls[:args.chunk_size])
+
+    results = {
+        'urls': args.urls,
+        'chunk_size': args.chunk_size,
+        'extract_features': timed(lambda: extract_features(urls[:args.chunk_size]), len(features)),
+        'score_features': timed(lambda: scorer.score_features(features), len(features)),
+        'score_batch': timed(lambda: scorer.score(urls, args.chunk_size), len(urls)),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'urls.txt')
+        with open(input_path, 'w', encoding='utf-8') as f:
+            f.writelines(url + '\n' for url in urls)
+        results['score_file'] = timed(
+            lambda: scorer.score_file(input_path, os.path.join(tmp, 'scores.tsv'), args.chunk_size),
+            len(urls))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
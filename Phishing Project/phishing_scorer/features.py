@@ -0,0 +1,93 @@
+"""
+Lexical URL features matching the columns of the LochanaAbeywickrama/phishing dataset.
+"""
+import re
+
+import numpy as np
+
+# Column order used by the dataset (and therefore by the fitted model)
+FEATURE_COLUMNS = [
+    'url_length', 'n_dots', 'n_hypens', 'n_underline', 'n_slash',
+    'n_questionmark', 'n_equal', 'n_at', 'n_and', 'n_exclamation',
+    'n_space', 'n_tilde', 'n_comma', 'n_plus', 'n_asterisk',
+    'n_hastag', 'n_dollar', 'n_percent', 'n_redirection',
+]
+
+# Character counted by each n_* column
+CHAR_COLUMNS = {
+    'n_dots': '.',
+    'n_hypens': '-',
+    'n_underline': '_',
+    'n_slash': '/',
+    'n_questionmark': '?',
+    'n_equal': '=',
+    'n_at': '@',
+    'n_and': '&',
+    'n_exclamation': '!',
+    'n_space': ' ',
+    'n_tilde': '~',
+    'n_comma': ',',
+    'n_plus': '+',
+    'n_asterisk': '*',
+    'n_hastag': '#',
+    'n_dollar': '$',
+    'n_percent': '%',
+}
+
+# The dataset's URLs carry no scheme (e.g. validation row 1 has url_length=22
+# and n_slash=0), so "http://" / "https://" is stripped before counting.
+_SCHEME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*://')
+
+# Byte value -> feature column (or -1 when the byte is not counted)
+_BYTE_TO_COLUMN = np.full(256, -1, dtype=np.int64)
+for _name, _char in CHAR_COLUMNS.items():
+    _BYTE_TO_COLUMN[ord(_char)] = FEATURE_COLUMNS.index(_name)
+
+
+def normalize_url(url):
+    """Puts a raw URL in the dataset's form: surrounding whitespace and the scheme removed"""
+    return _SCHEME_RE.sub('', url.strip(), count=1)
+
+
+def extract_features(urls, redirections=None):
+    """
+    Computes the dataset's lexical features for a batch of raw URLs.
+
+    All URLs are packed into one byte buffer, every byte is mapped to its
+    feature column with a lookup table and the counts are produced by a single
+    np.bincount, so the only per-URL Python work is normalizing and encoding.
+
+    URLs are passed through normalize_url first, so "https://example.com/a"
+    and "example.com/a" get the same features, matching the training data.
+
+    Args:
+        urls (list[str]): Raw URLs, with or without a scheme.
+        redirections (array-like, optional): Number of HTTP redirections per URL.
+            This column comes from following the URL over the network and cannot
+            be derived from the string; it is 0 when not given.
+
+    Returns:
+        np.ndarray: (len(urls), len(FEATURE_COLUMNS)) float64 feature matrix.
+    """
+    n = len(urls)
+    n_features = len(FEATURE_COLUMNS)
+    if n == 0:
+        return np.zeros((0, n_features))
+
+    urls = [normalize_url(url) for url in urls]
+    encoded = [url.encode('utf-8', 'replace') for url in urls]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=n)
+    buffer = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+    columns = _BYTE_TO_COLUMN[buffer]
+    rows = np.repeat(np.arange(n, dtype=np.int64), lengths)
+    counted = columns >= 0
+    flat = rows[counted] * n_features + columns[counted]
+    features = np.bincount(flat, minlength=n * n_features).astype(np.float64)
+    features = features.reshape(n, n_features)
+
+    # url_length counts characters, not UTF-8 bytes
+    features[:, 0] = np.fromiter((len(url) for url in urls), dtype=np.int64, count=n)
+    if redirections is not None:
+        features[:, FEATURE_COLUMNS.index('n_redirection')] = np.asarray(redirections)
+    return features
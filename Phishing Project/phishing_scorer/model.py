@@ -0,0 +1,139 @@
+"""
+Persisted StandardScaler + LogisticRegression model fused into one linear scorer.
+"""
+import csv
+import json
+import os
+import re
+
+import joblib
+import numpy as np
+from scipy.special import expit
+
+from .features import FEATURE_COLUMNS, extract_features
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def latest_version(save_dir, prefix='phishing_model'):
+    """Path of the highest <prefix>_v<N>.joblib in a directory"""
+    pattern = re.compile(rf'^{re.escape(prefix)}_v(\d+)\.joblib$')
+    versions = [int(m.group(1)) for m in map(pattern.match, os.listdir(save_dir)) if m]
+    if not versions:
+        raise FileNotFoundError(f"No '{prefix}' models found in {save_dir}")
+    return os.path.join(save_dir, f'{prefix}_v{max(versions)}.joblib')
+
+
+class PhishingScorer:
+    """
+    Phishing probability for raw URLs.
+
+    The scaler and the logistic regression are folded into a single weight
+    vector and bias at load time,
+
+        w = coef / scale
+        b = intercept - sum(coef * mean / scale)
+
+    so scoring a chunk is one matrix-vector product followed by a sigmoid.
+    """
+
+    def __init__(self, scaler, model, columns=FEATURE_COLUMNS, metadata=None):
+        self.scaler = scaler
+        self.model = model
+        self.columns = list(columns)
+        self.metadata = metadata or {}
+        if self.columns != FEATURE_COLUMNS:
+            raise ValueError(f"Model was trained on columns {self.columns}, expected {FEATURE_COLUMNS}")
+
+        coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+        mean = np.asarray(scaler.mean_ if scaler.with_mean else 0.0, dtype=np.float64)
+        scale = np.asarray(scaler.scale_ if scaler.with_std else 1.0, dtype=np.float64)
+        self.weights = coef / scale
+        self.bias = float(np.ravel(model.intercept_)[0] - np.sum(coef * mean / scale))
+
+    # =======================
+    # --- Persistence ---
+    # =======================
+    def save(self, path):
+        joblib.dump({
+            'scaler': self.scaler,
+            'model': self.model,
+            'columns': self.columns,
+            'metadata': self.metadata,
+        }, path)
+
+    def save_versioned(self, save_dir, prefix='phishing_model'):
+        """
+        Saves the model as <prefix>_v<N>.joblib using the next free version number,
+        with the metadata alongside as <prefix>_v<N>.json.
+
+        Returns:
+            str: Path of the saved model.
+        """
+        os.makedirs(save_dir, exist_ok=True)
+        version = 0
+        while os.path.exists(os.path.join(save_dir, f'{prefix}_v{version}.joblib')):
+            version += 1
+
+        self.metadata = dict(self.metadata, version=version)
+        model_path = os.path.join(save_dir, f'{prefix}_v{version}.joblib')
+        self.save(model_path)
+        with open(os.path.join(save_dir, f'{prefix}_v{version}.json'), 'w') as f:
+            json.dump(self.metadata, f, indent=2, default=str)
+        return model_path
+
+    @classmethod
+    def load(cls, path):
+        """Loads a saved model; a directory loads its latest versioned model"""
+        if os.path.isdir(path):
+            path = latest_version(path)
+        artifact = joblib.load(path)
+        return cls(artifact['scaler'], artifact['model'], artifact['columns'], artifact.get('metadata'))
+
+    # =======================
+    # --- Scoring ---
+    # =======================
+    def score_features(self, features):
+        """Phishing probabilities for an already extracted feature matrix"""
+        return expit(features @ self.weights + self.bias)
+
+    def score(self, urls, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Phishing probabilities for a list of raw URLs, processed in chunks"""
+        scores = np.empty(len(urls), dtype=np.float64)
+        for start in range(0, len(urls), chunk_size):
+            chunk = urls[start:start + chunk_size]
+            scores[start:start + len(chunk)] = self.score_features(extract_features(chunk))
+        return scores
+
+    def score_stream(self, lines, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Yields (urls, scores) chunks for an iterable of URLs, one URL per line"""
+        chunk = []
+        for line in lines:
+            url = line.strip()
+            if url:
+                chunk.append(url)
+            if len(chunk) >= chunk_size:
+                yield chunk, self.score_features(extract_features(chunk))
+                chunk = []
+        if chunk:
+            yield chunk, self.score_features(extract_features(chunk))
+
+    def score_file(self, input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, threshold=0.5):
+        """
+        Scores a text file of URLs (one per line) and writes a TSV of url, score, label.
+        URLs containing tabs or quotes are quoted by the csv module, so the
+        output can be read back with csv.reader(f, delimiter='\t').
+
+        Returns:
+            int: Number of URLs scored.
+        """
+        total = 0
+        with open(input_path, encoding='utf-8', errors='replace') as src, \
+                open(output_path, 'w', encoding='utf-8', newline='') as dst:
+            writer = csv.writer(dst, delimiter='\t', lineterminator='\n')
+            writer.writerow(['url', 'score', 'phishing'])
+            for urls, scores in self.score_stream(src, chunk_size):
+                labels = (scores >= threshold).astype(int)
+                writer.writerows((u, f"{s:.6f}", l) for u, s, l in zip(urls, scores, labels))
+                total += len(urls)
+        return total
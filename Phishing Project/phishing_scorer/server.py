@@ -0,0 +1,89 @@
+"""
+Small local HTTP scoring endpoint.
+
+    python -m phishing_scorer.server --model phishing_model.joblib --port 8000
+
+    curl -s localhost:8000/score -d '{"urls": ["http://example.com/login?user=a@b"]}'
+    -> {"scores": [0.73], "phishing": [1]}
+"""
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .model import PhishingScorer
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+def make_handler(scorer, threshold=0.5):
+    class ScoringHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, {'status': 'ok'})
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/score':
+                self._send_json(404, {'error': 'not found'})
+                return
+
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                if length < 0:
+                    raise ValueError
+            except ValueError:
+                self._send_json(400, {'error': 'invalid Content-Length header'})
+                return
+            if length > MAX_BODY_BYTES:
+                self._send_json(413, {'error': 'request body too large'})
+                return
+            try:
+                urls = json.loads(self.rfile.read(length))['urls']
+                if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+                    raise ValueError
+            except (ValueError, KeyError, TypeError):
+                self._send_json(400, {'error': "expected a JSON body like {\"urls\": [\"...\"]}"})
+                return
+
+            scores = scorer.score(urls)
+            self._send_json(200, {
+                'scores': scores.round(6).tolist(),
+                'phishing': (scores >= threshold).astype(int).tolist(),
+            })
+
+    return ScoringHandler
+
+
+def serve(scorer, host='127.0.0.1', port=8000, threshold=0.5):
+    server = ThreadingHTTPServer((host, port), make_handler(scorer, threshold))
+    print(f"Scoring on http://{host}:{port}/score")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the phishing URL scorer over HTTP")
+    parser.add_argument('--model', default='phishing_model.joblib')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--threshold', type=float, default=0.5)
+    args = parser.parse_args()
+
+    serve(PhishingScorer.load(args.model), args.host, args.port, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Fits the notebook's StandardScaler + LogisticRegression model and saves it for scoring.
+
+    python -m phishing_scorer.train --output phishing_model.joblib
+"""
+import argparse
+
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import classification_report, roc_auc_score
+from sklearn.preprocessing import StandardScaler
+
+from .features import FEATURE_COLUMNS
+from .model import PhishingScorer
+
+DATASET_ID = "LochanaAbeywickrama/phishing"
+TARGET_COLUMN = "phishing"
+
+
+def load_split(split):
+    """Loads a dataset split as (X, y) with the columns in FEATURE_COLUMNS order"""
+    from datasets import load_dataset
+
+    df = load_dataset(DATASET_ID, split=split).to_pandas()
+    df.dropna(inplace=True)
+    return df[FEATURE_COLUMNS].to_numpy(dtype=float), df[TARGET_COLUMN].to_numpy()
+
+
+def fit(X_train, y_train, C=0.1, penalty='l1', solver='liblinear'):
+    """Best parameters found by GridSearchCV in the notebook"""
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    log_reg = LogisticRegression(C=C, penalty=penalty, solver=solver, random_state=42)
+    log_reg.fit(X_train_scaled, y_train)
+    return PhishingScorer(scaler, log_reg)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and save the phishing URL scorer")
+    parser.add_argument('--output', default='phishing_model.joblib')
+    args = parser.parse_args()
+
+    X_train, y_train = load_split('train')
+    X_val, y_val = load_split('validation')
+
+    scorer = fit(X_train, y_train)
+    y_prob = scorer.score_features(X_val)
+    print("Classification Report (Validation Set):")
+    print(classification_report(y_val, (y_prob >= 0.5).astype(int)))
+    print(f"Validation AUC: {roc_auc_score(y_val, y_prob):.4f}")
+
+    scorer.save(args.output)
+    print(f"Saved model to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Out-of-core, parallel training mode for the phishing classifier.
+
+The dataset is never loaded as a whole: it is read as Arrow record batches,
+a StandardScaler is fitted with partial_fit in one pass, and an
+SGDClassifier(loss='log_loss') is fitted incrementally with partial_fit.
+Hyperparameters are chosen by successive halving, with the candidates of each
+rung trained in parallel worker processes.
+
+Training batches are shuffled with a seed: the order of files / row groups
+(Parquet) or batch slices (Hugging Face) is permuted every epoch, and rows are
+mixed across a buffer of `shuffle_buffer` batches. Rows sorted within a single
+row group can only move inside that buffer, so very large files ordered by
+label or source should still be pre-shuffled.
+
+    # Hugging Face dataset (memory-mapped Arrow cache)
+    python -m phishing_scorer.train_streaming --save-dir models
+
+    # Parquet / Arrow files larger than RAM
+    python -m phishing_scorer.train_streaming --train data/train/*.parquet \\
+        --val data/val/*.parquet --save-dir models --n-jobs 16
+"""
+import argparse
+import itertools
+import math
+import time
+
+import numpy as np
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.preprocessing import StandardScaler
+
+from .features import FEATURE_COLUMNS
+from .model import PhishingScorer
+from .train import DATASET_ID, TARGET_COLUMN
+
+DEFAULT_BATCH_SIZE = 65_536
+DEFAULT_SHUFFLE_BUFFER = 8
+CLASSES = np.array([0, 1])
+
+PARAM_GRID = {
+    'alpha': [1e-6, 1e-5, 1e-4, 1e-3, 1e-2],
+    'penalty': ['l2', 'l1', 'elasticnet'],
+}
+
+
+# =======================
+# --- Record Batch Sources ---
+# =======================
+def _batch_to_numpy(batch):
+    """(X, y) from an Arrow record batch / table, dropping rows with nulls"""
+    X = np.column_stack([
+        batch.column(name).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+        for name in FEATURE_COLUMNS
+    ])
+    y = batch.column(TARGET_COLUMN).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+    keep = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+    return X[keep], y[keep].astype(np.int64)
+
+
+def _shuffle_rows(batches, rng, buffer_batches):
+    """
+    Mixes rows across groups of `buffer_batches` batches. The number of
+    batches is unchanged, so max_batches budgets keep their meaning.
+    """
+    def flush(buffer):
+        X = np.concatenate([X for X, _ in buffer])
+        y = np.concatenate([y for _, y in buffer])
+        perm = rng.permutation(len(y))
+        for idx in np.array_split(perm, len(buffer)):
+            yield X[idx], y[idx]
+
+    buffer = []
+    for batch in batches:
+        buffer.append(batch)
+        if len(buffer) >= buffer_batches:
+            yield from flush(buffer)
+            buffer = []
+    if buffer:
+        yield from flush(buffer)
+
+
+class ArrowFileSource:
+    """Streams record batches from Parquet / Arrow IPC files with pyarrow.dataset"""
+
+    def __init__(self, paths, batch_size=DEFAULT_BATCH_SIZE, file_format='parquet',
+                 shuffle_buffer=DEFAULT_SHUFFLE_BUFFER):
+        self.paths = list(paths)
+        self.batch_size = batch_size
+        self.file_format = file_format
+        self.shuffle_buffer = shuffle_buffer
+
+    def iter_batches(self, max_batches=None, seed=None):
+        """(X, y) batches in file order, or shuffled with `seed`"""
+        import pyarrow.dataset as pa_ds
+
+        columns = FEATURE_COLUMNS + [TARGET_COLUMN]
+        dataset = pa_ds.dataset(self.paths, format=self.file_format)
+        if seed is None:
+            batches = dataset.to_batches(columns=columns, batch_size=self.batch_size)
+            for batch in itertools.islice(batches, max_batches):
+                yield _batch_to_numpy(batch)
+            return
+
+        rng = np.random.default_rng(seed)
+        fragments = list(dataset.get_fragments())
+        if self.file_format == 'parquet':
+            fragments = [rg for fragment in fragments for rg in fragment.split_by_row_group()]
+        batches = (
+            _batch_to_numpy(batch)
+            for i in rng.permutation(len(fragments))
+            for batch in fragments[i].to_batches(columns=columns, batch_size=self.batch_size)
+        )
+        yield from itertools.islice(_shuffle_rows(batches, rng, self.shuffle_buffer), max_batches)
+
+
+class HuggingFaceSource:
+    """Streams record batches from a Hugging Face dataset split.
+
+    Only the dataset id is pickled to worker processes; each worker opens the
+    memory-mapped Arrow cache itself.
+    """
+
+    def __init__(self, split, dataset_id=DATASET_ID, batch_size=DEFAULT_BATCH_SIZE,
+                 shuffle_buffer=DEFAULT_SHUFFLE_BUFFER):
+        self.split = split
+        self.dataset_id = dataset_id
+        self.batch_size = batch_size
+        self.shuffle_buffer = shuffle_buffer
+
+    def iter_batches(self, max_batches=None, seed=None):
+        """(X, y) batches in dataset order, or shuffled with `seed`"""
+        from datasets import load_dataset
+
+        dataset = load_dataset(self.dataset_id, split=self.split).with_format('arrow')
+        if seed is None:
+            batches = dataset.iter(batch_size=self.batch_size)
+            for table in itertools.islice(batches, max_batches):
+                yield _batch_to_numpy(table)
+            return
+
+        # Slices of the memory-mapped table are cheap, so permute the slice order
+        rng = np.random.default_rng(seed)
+        starts = np.arange(0, len(dataset), self.batch_size)
+        batches = (
+            _batch_to_numpy(dataset[int(start):int(start) + self.batch_size])
+            for start in rng.permutation(starts)
+        )
+        yield from itertools.islice(_shuffle_rows(batches, rng, self.shuffle_buffer), max_batches)
+
+
+# =======================
+# --- Streaming Fit ---
+# =======================
+def fit_scaler(source):
+    """StandardScaler fitted in a single pass over the stream, with the row and batch counts"""
+    scaler = StandardScaler()
+    rows = batches = 0
+    for X, _ in source.iter_batches():
+        batches += 1
+        if len(X):
+            scaler.partial_fit(X)
+            rows += len(X)
+    if rows == 0:
+        raise ValueError("Training data is empty")
+    return scaler, rows, batches
+
+
+def fit_sgd(params, source, scaler, epochs=1, max_batches=None, random_state=42):
+    """
+    SGD logistic regression fitted with partial_fit over the (first max_batches)
+    shuffled record batches. Epoch e is shuffled with seed random_state + e, so
+    every candidate of a rung sees the same batches in the same order.
+    """
+    model = SGDClassifier(loss='log_loss', random_state=random_state, **params)
+    for epoch in range(epochs):
+        for X, y in source.iter_batches(max_batches, seed=random_state + epoch):
+            if len(X):
+                model.partial_fit(scaler.transform(X), y, classes=CLASSES)
+    return model
+
+
+def evaluate(model, source, scaler):
+    """Validation ROC-AUC, streaming the validation set batch by batch"""
+    scores, labels = [], []
+    for X, y in source.iter_batches():
+        if len(X):
+            scores.append(model.decision_function(scaler.transform(X)))
+            labels.append(y)
+    return roc_auc_score(np.concatenate(labels), np.concatenate(scores))
+
+
+def _run_candidate(params, train_source, val_source, scaler, epochs, max_batches, seed):
+    start = time.perf_counter()
+    model = fit_sgd(params, train_source, scaler, epochs, max_batches, random_state=seed)
+    return {
+        'params': params,
+        'model': model,
+        'auc': evaluate(model, val_source, scaler),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _n_rungs(n_candidates, eta):
+    """Number of rungs that evaluate more than one candidate"""
+    rungs = 0
+    while n_candidates > 1:
+        n_candidates = max(1, n_candidates // eta)
+        rungs += 1
+    return rungs
+
+
+def successive_halving(train_source, val_source, scaler, total_batches, param_grid=PARAM_GRID,
+                       eta=3, min_batches=1, epochs=1, n_jobs=-1, seed=42):
+    """
+    Successive halving over param_grid.
+
+    Every rung trains all surviving candidates in parallel on the first
+    `budget` record batches, keeps the best 1/eta by validation AUC and
+    multiplies the budget by eta, until a single candidate survives or the
+    budget covers the whole training set. The starting budget is chosen so the
+    last rung that still compares candidates trains on all batches.
+
+    Returns:
+        tuple: (best result dict, list of per-rung summaries)
+    """
+    candidates = [dict(zip(param_grid, values)) for values in itertools.product(*param_grid.values())]
+    last_rung = max(0, _n_rungs(len(candidates), eta) - 1)
+    budget = max(min_batches, math.ceil(total_batches / eta ** last_rung))
+    history = []
+
+    with Parallel(n_jobs=n_jobs) as parallel:
+        while True:
+            budget = min(budget, total_batches)
+            results = parallel(
+                delayed(_run_candidate)(params, train_source, val_source, scaler, epochs, budget, seed)
+                for params in candidates
+            )
+            results.sort(key=lambda r: r['auc'], reverse=True)
+            history.append({
+                'batches': budget,
+                'candidates': [{'params': r['params'], 'auc': round(r['auc'], 6),
+                                'seconds': round(r['seconds'], 3)} for r in results],
+            })
+            print(f"Rung {len(history)}: {len(results)} candidates on {budget} batches, "
+                  f"best AUC {results[0]['auc']:.4f} with {results[0]['params']}")
+
+            candidates = [r['params'] for r in results[:max(1, len(results) // eta)]]
+            if len(candidates) == 1 or budget >= total_batches:
+                return results[0], history
+            budget *= eta
+
+
+def train(train_source, val_source, save_dir, eta=3, epochs=1, final_epochs=3, n_jobs=-1, seed=42):
+    """Runs the full streaming pipeline and writes a versioned model artifact"""
+    start = time.perf_counter()
+    scaler, rows, total_batches = fit_scaler(train_source)
+    print(f"Scaler fitted on {rows} rows ({total_batches} record batches)")
+
+    best, history = successive_halving(train_source, val_source, scaler, total_batches,
+                                       eta=eta, epochs=epochs, n_jobs=n_jobs, seed=seed)
+
+    # Refit the winner on the full stream
+    model = fit_sgd(best['params'], train_source, scaler, epochs=final_epochs, random_state=seed)
+    val_auc = evaluate(model, val_source, scaler)
+    print(f"Final model {best['params']}: validation AUC {val_auc:.4f}")
+
+    scorer = PhishingScorer(scaler, model, metadata={
+        'trainer': 'train_streaming',
+        'params': best['params'],
+        'val_auc': val_auc,
+        'train_rows': rows,
+        'batch_size': train_source.batch_size,
+        'final_epochs': final_epochs,
+        'seed': seed,
+        'search': history,
+        'train_seconds': round(time.perf_counter() - start, 3),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'sklearn_version': sklearn.__version__,
+    })
+    path = scorer.save_versioned(save_dir)
+    print(f"Saved model to {path}")
+    return scorer, path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Out-of-core training of the phishing URL scorer")
+    parser.add_argument('--train', nargs='+', help='Parquet/Arrow training files (default: Hugging Face dataset)')
+    parser.add_argument('--val', nargs='+', help='Parquet/Arrow validation files')
+    parser.add_argument('--format', default='parquet', choices=['parquet', 'arrow', 'ipc'])
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--save-dir', default='models')
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--epochs', type=int, default=1, help='Epochs per candidate during the search')
+    parser.add_argument('--final-epochs', type=int, default=3)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--seed', type=int, default=42, help='Seed for batch/row shuffling and SGD')
+    parser.add_argument('--shuffle-buffer', type=int, default=DEFAULT_SHUFFLE_BUFFER,
+                        help='Number of batches whose rows are mixed together')
+    args = parser.parse_args()
+
+    if args.train:
+        if not args.val:
+            parser.error("--val is required together with --train")
+        train_source = ArrowFileSource(args.train, args.batch_size, args.format, args.shuffle_buffer)
+        val_source = ArrowFileSource(args.val, args.batch_size, args.format)
+    else:
+        train_source = HuggingFaceSource('train', batch_size=args.batch_size,
+                                         shuffle_buffer=args.shuffle_buffer)
+        val_source = HuggingFaceSource('validation', batch_size=args.batch_size)
+
+    train(train_source, val_source, args.save_dir, eta=args.eta, epochs=args.epochs,
+          final_epochs=args.final_epochs, n_jobs=args.n_jobs, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Offline benchmark of the RAG pipeline.
+
+Generates synthetic PDFs with known facts, starts local stub embedding/chat
+servers that speak the Azure AI Inference API, and runs
+initialize_chatbot_from_file + answer_query for every chunk_size/overlap/k
+combination. Reports docs/sec, query p50/p99, index memory, retrieval recall
+and per-stage timings as JSON so runs can be compared over time.
+
+    python benchmark.py --docs 20 --output bench.json
+    python benchmark.py --baseline bench.json   # exits 1 on a regression
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fitz  # PyMuPDF
+import numpy as np
+
+from utils import rag
+from utils.metrics import MemorySink, set_sink
+
+EMBEDDING_DIM = 256
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_WORDS = ("system data model report value process market energy network policy "
+          "review signal budget design sample result method source control level "
+          "quality service region factor update").split()
+_ATTRIBUTES = ["code name", "launch year", "budget owner", "primary site", "lead engineer"]
+
+
+# =======================
+# --- Stub Servers ---
+# =======================
+def hashed_embedding(text, dim=EMBEDDING_DIM):
+    """Deterministic bag-of-words embedding, so lexical overlap drives retrieval"""
+    vec = np.zeros(dim, dtype=np.float32)
+    for token in TOKEN_RE.findall(text.lower()):
+        vec[zlib.crc32(token.encode()) % dim] += 1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def make_stub_handler(embed_latency, chat_latency):
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            path = self.path.split("?")[0]
+            if path.endswith("/embeddings"):
+                time.sleep(embed_latency)
+                inputs = request["input"]
+                self._send_json({
+                    "id": "stub", "object": "list", "model": request.get("model", "stub"),
+                    "data": [{"object": "embedding", "index": i, "embedding": hashed_embedding(text).tolist()}
+                             for i, text in enumerate(inputs)],
+                    "usage": {"prompt_tokens": 0, "total_tokens": 0},
+                })
+            elif path.endswith("/chat/completions"):
+                time.sleep(chat_latency)
+                self._send_json({
+                    "id": "stub", "object": "chat.completion", "created": int(time.time()),
+                    "model": request.get("model", "stub"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "Stub answer."}}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                })
+            else:
+                self.send_error(404)
+
+    return StubHandler
+
+
+def start_stub_server(embed_latency=0.0, chat_latency=0.0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_stub_handler(embed_latency, chat_latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# =======================
+# --- Synthetic PDFs ---
+# =======================
+def make_document(rng, doc_id, pages, facts_per_doc):
+    """Filler text with `facts_per_doc` unique facts; returns (pages of text, queries)"""
+    sentences = []
+    for _ in range(pages * 20):
+        words = rng.choice(_WORDS, size=rng.integers(8, 14))
+        sentences.append(" ".join(words).capitalize() + ".")
+
+    queries = []
+    positions = rng.choice(len(sentences), size=facts_per_doc, replace=False)
+    for i, pos in enumerate(positions):
+        entity = f"project{doc_id}x{i}"
+        attribute = _ATTRIBUTES[i % len(_ATTRIBUTES)]
+        value = f"v{doc_id}q{i}z"
+        sentences[pos] = f"The {attribute} of {entity} is {value}."
+        queries.append({"question": f"What is the {attribute} of {entity}?", "answer": value})
+
+    per_page = len(sentences) // pages
+    page_texts = [" ".join(sentences[p * per_page:(p + 1) * per_page]) for p in range(pages)]
+    return page_texts, queries
+
+
+def write_pdf(path, page_texts):
+    doc = fitz.open()
+    for text in page_texts:
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, page.rect.width - 50, page.rect.height - 50), text, fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def make_corpus(out_dir, docs, pages, facts_per_doc, seed=0):
+    rng = np.random.default_rng(seed)
+    corpus = []
+    for doc_id in range(docs):
+        page_texts, queries = make_document(rng, doc_id, pages, facts_per_doc)
+        path = os.path.join(out_dir, f"doc_{doc_id}.pdf")
+        write_pdf(path, page_texts)
+        corpus.append({"path": path, "queries": queries})
+    return corpus
+
+
+# =======================
+# --- Benchmark ---
+# =======================
+def _summary_ms(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {
+        "count": int(len(ms)),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+    }
+
+
+def _stage_summary(events):
+    by_stage = {}
+    for event in events:
+        by_stage.setdefault(event["stage"], []).append(event)
+    summary = {}
+    for name, stage_events in sorted(by_stage.items()):
+        summary[name] = _summary_ms([e["seconds"] for e in stage_events])
+        for field in ("rss_delta_mb", "peak_alloc_mb"):
+            values = [e[field] for e in stage_events if field in e]
+            if values:
+                summary[name][f"max_{field}"] = max(values)
+    return summary
+
+
+def run_config(corpus, chunk_size, overlap, ks, sink):
+    """Ingests every document once, then runs all queries for each k"""
+    sink.clear()
+    indexes = []
+    start = time.perf_counter()
+    for doc in corpus:
+        index, _, chunks, status = rag.initialize_chatbot_from_file(doc["path"], chunk_size, overlap)
+        if index is None:
+            raise RuntimeError(f"{doc['path']}: {status}")
+        indexes.append((index, chunks))
+    ingest_seconds = time.perf_counter() - start
+    ingest_events = list(sink.events)
+
+    index_bytes = [rag.index_memory_bytes(index) for index, _ in indexes]
+    base = {
+        "chunk_size": chunk_size,
+        "overlap": overlap,
+        "docs": len(corpus),
+        "docs_per_sec": round(len(corpus) / ingest_seconds, 3),
+        "ingest_seconds": round(ingest_seconds, 4),
+        "chunks_mean": round(float(np.mean([len(chunks) for _, chunks in indexes])), 2),
+        "index_bytes_mean": int(np.mean(index_bytes)),
+        "index_bytes_total": int(np.sum(index_bytes)),
+    }
+
+    results = []
+    for k in ks:
+        sink.clear()
+        latencies, hits = [], 0
+        for doc, (index, chunks) in zip(corpus, indexes):
+            for query in doc["queries"]:
+                start = time.perf_counter()
+                _, retrieved = rag.answer_query(index, chunks, query["question"], k=k)
+                latencies.append(time.perf_counter() - start)
+                hits += any(query["answer"] in chunks[idx] for idx in retrieved)
+
+        query_summary = _summary_ms(latencies)
+        results.append({
+            **base,
+            "k": k,
+            "queries": len(latencies),
+            "query_p50_ms": query_summary["p50_ms"],
+            "query_p99_ms": query_summary["p99_ms"],
+            "recall_at_k": round(hits / len(latencies), 4),
+            "stages": _stage_summary(ingest_events + sink.events),
+        })
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of the current results against a previous run's JSON"""
+    key = lambda r: (r["chunk_size"], r["overlap"], r["k"])
+    previous = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        checks = [
+            ("docs_per_sec", result["docs_per_sec"] < old["docs_per_sec"] * (1 - tolerance)),
+            ("query_p50_ms", result["query_p50_ms"] > old["query_p50_ms"] * (1 + tolerance)),
+            ("query_p99_ms", result["query_p99_ms"] > old["query_p99_ms"] * (1 + tolerance)),
+            ("index_bytes_mean", result["index_bytes_mean"] > old["index_bytes_mean"] * (1 + tolerance)),
+            ("recall_at_k", result["recall_at_k"] < old["recall_at_k"] - 0.01),
+        ]
+        for metric, regressed in checks:
+            if regressed:
+                regressions.append({"config": dict(zip(("chunk_size", "overlap", "k"), key(result))),
+                                    "metric": metric, "baseline": old[metric], "current": result[metric]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the PDF chatbot RAG pipeline")
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--facts-per-doc", type=int, default=10)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[250, 500, 1000])
+    parser.add_argument("--overlaps", type=int, nargs="+", default=[0, 100])
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="Simulated embedding API latency")
+    parser.add_argument("--chat-latency-ms", type=float, default=0.0, help="Simulated chat API latency")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Record per-stage Python allocation peaks with tracemalloc (slower)")
+    parser.add_argument("--output", help="Write the results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Previous results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown vs. baseline")
+    args = parser.parse_args()
+
+    server, endpoint = start_stub_server(args.embed_latency_ms / 1000, args.chat_latency_ms / 1000)
+    rag.configure(endpoint=endpoint, token="benchmark")
+    sink = MemorySink()
+    previous_sink = set_sink(sink)
+    if args.trace_memory:
+        tracemalloc.start()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus = make_corpus(tmp, args.docs, args.pages, args.facts_per_doc)
+            results = []
+            for chunk_size, overlap in itertools.product(args.chunk_sizes, args.overlaps):
+                if overlap >= chunk_size:
+                    continue
+                results += run_config(corpus, chunk_size, overlap, args.k, sink)
+                print(f"chunk_size={chunk_size} overlap={overlap} done", file=sys.stderr)
+    finally:
+        set_sink(previous_sink)
+        server.shutdown()
+        if args.trace_memory:
+            tracemalloc.stop()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": vars(args),
+        },
+        "results": results,
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(results, json.load(f), args.tolerance)
+        exit_code = 1 if report["regressions"] else 0
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger("chatbot.metrics")
+
+
+# =======================
+# --- Metrics Sinks ---
+# =======================
+class MetricsSink:
+    """
+    Receives one event per instrumented stage.
+
+    Subclasses override record(); an event is a flat dict such as
+    {"stage": "embed", "seconds": 0.42, "rss_mb": 310.5, "n_chunks": 37}.
+    """
+
+    def record(self, event):
+        raise NotImplementedError
+
+
+class NullSink(MetricsSink):
+    """Discards every event (the default, so instrumentation costs nothing)"""
+
+    def record(self, event):
+        pass
+
+
+class LoggingSink(MetricsSink):
+    """
+    Writes each event to the `chatbot.metrics` logger.
+
+    When logging has not been configured (no handler on the logger or root),
+    a stderr handler is attached so the events are not silently dropped.
+    """
+
+    def __init__(self, level=logging.INFO):
+        self.level = level
+        if logger.level == logging.NOTSET:
+            logger.setLevel(level)
+        if not logger.hasHandlers():
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+            logger.addHandler(handler)
+
+    def record(self, event):
+        logger.log(self.level, json.dumps(event))
+
+
+class JsonlSink(MetricsSink):
+    """Appends each event as a JSON line to a file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, event):
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event) + "\n")
+
+
+class MemorySink(MetricsSink):
+    """Keeps events in a list, e.g. for benchmarks and tests"""
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def record(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def clear(self):
+        with self._lock:
+            self.events = []
+
+
+_sink = NullSink()
+
+
+def set_sink(sink):
+    """
+    Installs the sink that receives stage events.
+
+    Args:
+        sink (MetricsSink | None): New sink; None restores the NullSink.
+
+    Returns:
+        MetricsSink: The previously installed sink.
+    """
+    global _sink
+    previous, _sink = _sink, sink or NullSink()
+    return previous
+
+
+def get_sink():
+    return _sink
+
+
+# =======================
+# --- Stage Instrumentation ---
+# =======================
+def _rss_mb():
+    """Current resident set size in MB (Linux), or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return None
+
+
+# Open stages of the current thread, each with the highest traced memory seen
+# while it was open. tracemalloc has a single peak, so a nested stage resets it
+# and folds the value back into its parent.
+_open_stages = threading.local()
+
+
+def _stage_stack():
+    if not hasattr(_open_stages, "stack"):
+        _open_stages.stack = []
+    return _open_stages.stack
+
+
+@contextmanager
+def stage(name, **tags):
+    """
+    Times a pipeline stage and reports it to the installed sink.
+
+    The event holds the wall time, the process RSS after the stage and its
+    change, plus the Python allocation peak of the stage when tracemalloc is
+    tracing; the peak of a stage includes the peaks of the stages nested in it.
+    Extra key/values can be added to the yielded dict inside the block.
+
+    Example:
+        with stage("split", chunk_size=500) as event:
+            chunks = split_text_into_chunks(text)
+            event["n_chunks"] = len(chunks)
+    """
+    sink = _sink
+    if isinstance(sink, NullSink):
+        yield {}
+        return
+
+    event = {"stage": name, **tags}
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        stack = _stage_stack()
+        traced_before, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+        frame = {"peak": traced_before}
+        stack.append(frame)
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    try:
+        yield event
+    finally:
+        event["seconds"] = time.perf_counter() - start
+        rss_after = _rss_mb()
+        if rss_after is not None:
+            event["rss_mb"] = round(rss_after, 2)
+            event["rss_delta_mb"] = round(rss_after - rss_before, 2)
+        if tracing:
+            peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            stack.pop()
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            event["peak_alloc_mb"] = round((peak - traced_before) / (1024 * 1024), 3)
+        sink.record(event)
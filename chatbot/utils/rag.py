@@ -0,0 +1,140 @@
+import os
+
+import faiss
+import numpy as np
+
+from azure.ai.inference import ChatCompletionsClient, EmbeddingsClient
+from azure.core.credentials import AzureKeyCredential
+from azure.ai.inference.models import SystemMessage, UserMessage
+
+from utils.metrics import stage
+from utils.pdf_loader import extract_text_from_pdf
+from utils.text_splitter import split_text_into_chunks
+
+ENDPOINT = os.environ.get("CHATBOT_ENDPOINT", "https://models.github.ai/inference")
+CHAT_MODEL = "openai/gpt-4o"
+EMBEDDINGS_MODEL = "openai/text-embedding-3-large"
+
+_config = {"endpoint": ENDPOINT, "token": os.environ.get("GITHUB_TOKEN")}
+_clients = {}
+
+
+def configure(endpoint=None, token=None):
+    """
+    Sets the inference endpoint and token. The cached clients are only dropped
+    when either value changes, so calling this on every Streamlit rerun is cheap.
+
+    Args:
+        endpoint (str, optional): Azure AI Inference compatible endpoint.
+        token (str, optional): API key for the endpoint.
+    """
+    updated = dict(_config)
+    if endpoint is not None:
+        updated["endpoint"] = endpoint
+    if token is not None:
+        updated["token"] = token
+    if updated != _config:
+        _config.update(updated)
+        _clients.clear()
+
+
+def _get_client(kind):
+    """Returns a cached EmbeddingsClient / ChatCompletionsClient for the configured endpoint"""
+    if kind not in _clients:
+        client_cls = EmbeddingsClient if kind == "embeddings" else ChatCompletionsClient
+        _clients[kind] = client_cls(
+            endpoint=_config["endpoint"],
+            credential=AzureKeyCredential(_config["token"] or ""),
+        )
+    return _clients[kind]
+
+
+# =======================
+# --- Embedding Logic ---
+# =======================
+def embed_text_chunks(chunks):
+    response = _get_client("embeddings").embed(input=chunks, model=EMBEDDINGS_MODEL)
+    return [item.embedding for item in response.data]
+
+def get_query_embedding(query):
+    with stage("query_embed"):
+        response = _get_client("embeddings").embed(input=[query], model=EMBEDDINGS_MODEL)
+        return response.data[0].embedding
+
+def build_faiss_index(embeddings):
+    dim = len(embeddings[0])
+    index = faiss.IndexFlatL2(dim)
+    index.add(np.array(embeddings).astype('float32'))
+    return index
+
+def index_memory_bytes(index):
+    """Approximate memory held by a flat FAISS index (the stored float32 vectors)"""
+    return index.ntotal * index.d * 4
+
+def query_faiss_index(index, query_embedding, k=3):
+    with stage("search", k=k, n_vectors=index.ntotal):
+        query_vec = np.array([query_embedding]).astype('float32')
+        distances, indices = index.search(query_vec, k)
+        return indices[0], distances[0]
+
+# =======================
+# --- Chat Completion Logic ---
+# =======================
+def generate_response_with_gpt(query, context, user_request_style="default", temperature=0.7, max_tokens=1000):
+    messages = [
+        SystemMessage("You are a highly capable assistant."),
+        UserMessage(
+            f"""
+            Context:
+            {context}
+
+            User Query:
+            {query}
+
+            User's Preferred Style: {user_request_style}
+            Answer:
+            """
+        ),
+    ]
+    with stage("generate", context_chars=len(context)):
+        response = _get_client("chat").complete(
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            model=CHAT_MODEL
+        )
+        return response.choices[0].message.content.strip()
+
+# =======================
+# --- Chatbot Initialization ---
+# =======================
+def initialize_chatbot_from_file(file, chunk_size=500, overlap=100):
+    with stage("initialize", chunk_size=chunk_size, overlap=overlap):
+        with stage("extract") as event:
+            text = extract_text_from_pdf(file)
+            event["n_chars"] = len(text)
+        if not text.strip():
+            return None, None, None, "The uploaded PDF is empty or could not be processed. Please try a different file."
+        with stage("split", chunk_size=chunk_size, overlap=overlap) as event:
+            chunks = split_text_into_chunks(text, chunk_size=chunk_size, overlap=overlap)
+            event["n_chunks"] = len(chunks)
+        with stage("embed", n_chunks=len(chunks)):
+            embeddings = embed_text_chunks(chunks)
+        with stage("index", n_chunks=len(chunks)) as event:
+            index = build_faiss_index(embeddings)
+            event["index_bytes"] = index_memory_bytes(index)
+    return index, embeddings, chunks, "Chatbot initialized successfully!"
+
+def answer_query(index, chunks, user_query, style="default", k=3):
+    """
+    Query path: embeds the question, retrieves the top-k chunks and generates the answer.
+
+    Returns:
+        tuple: (response text, indices of the retrieved chunks)
+    """
+    with stage("query", k=k):
+        query_embedding = get_query_embedding(user_query)
+        indices, _ = query_faiss_index(index, query_embedding, k=k)
+        indices = [int(idx) for idx in indices if idx >= 0]
+        context = "\n\n".join(chunks[idx] for idx in indices)
+        return generate_response_with_gpt(user_query, context, style), indices